@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
 """Pytest plugin entry point. Used for any fixtures needed."""
 
+import argparse
+import contextlib
+
 import pandas as pd
 import pytest
 from pytest_bdd import then, when, parsers, given
 from snowflake.sqlalchemy import URL
 from sqlalchemy import create_engine, Column, MetaData, Table
 
+from .teardown import ObjectRegistry, SnowflakeTeardown, OBJECT_COMMENT
 from .utils import table_to_df, assert_frame_equal_with_sort, stub_sql_functions
 
 
@@ -23,6 +27,53 @@ def pytest_addoption(parser):
     parser.addoption('--snowflake-warehouse', required=False, action='store',
                      help='optional snowflake warehouse for test environment',
                      default=None)
+    parser.addoption('--snowflake-async-teardown', required=False, action='store_true',
+                     help='drop the tables created by a scenario on a background thread',
+                     default=False)
+    parser.addoption('--snowflake-sweep-minutes', required=False, action='store', type=_non_negative_int,
+                     help='at session end drop tables created by this plugin older than these many minutes, '
+                          '0 disables the sweep',
+                     default=60)
+
+
+def _non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {number}")
+    return number
+
+
+def pytest_configure(config):
+    config._snowflake_teardown = SnowflakeTeardown(
+        asynchronous=config.getoption('--snowflake-async-teardown'),
+        sweep_minutes=config.getoption('--snowflake-sweep-minutes'),
+    )
+
+
+def pytest_sessionfinish(session):
+    snowflake_teardown = session.config._snowflake_teardown
+    snowflake_teardown.wait()
+    if not snowflake_teardown.sweep_minutes or not snowflake_teardown.schemas:
+        return
+    config = session.config
+    try:
+        with _snowflake_engine(config.getoption('--snowflake-user'),
+                               config.getoption('--snowflake-password'),
+                               config.getoption('--snowflake-account'),
+                               config.getoption('--snowflake-role'),
+                               config.getoption('--snowflake-warehouse')) as engine:
+            snowflake_teardown.sweep(engine)
+    except Exception as e:
+        snowflake_teardown.errors.append(f"sweeping orphaned tables failed: {e}")
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    snowflake_teardown = config._snowflake_teardown
+    if not snowflake_teardown.schemas:
+        return
+    terminalreporter.write_sep("-", "snowflake teardown")
+    for line in snowflake_teardown.summary():
+        terminalreporter.write_line(line)
 
 
 @pytest.fixture
@@ -57,6 +108,13 @@ def snowflake_sqlalchemy_conn(snowflake_user, snowflake_password, snowflake_acco
                                           snowflake_warehouse)
 
 
+@pytest.fixture(scope="function")
+def snowflake_object_registry(request, snowflake_sqlalchemy_conn):
+    registry = ObjectRegistry(request.config._snowflake_teardown)
+    yield registry
+    request.config._snowflake_teardown.teardown(snowflake_sqlalchemy_conn, registry)
+
+
 @pytest.fixture(scope="function")
 def current_timestamp():
     return None
@@ -92,24 +150,32 @@ def _snowflake_sqlalchemy_conn(snowflake_user, snowflake_password, snowflake_acc
         **optional_params
     ))
     connection = engine.connect()
-    yield engine
-    connection.close()
-    engine.dispose()
+    try:
+        yield engine
+    finally:
+        connection.close()
+        engine.dispose()
+
+
+@contextlib.contextmanager
+def _snowflake_engine(snowflake_user, snowflake_password, snowflake_account, snowflake_role, snowflake_warehouse):
+    yield from _snowflake_sqlalchemy_conn(snowflake_user, snowflake_password, snowflake_account, snowflake_role,
+                                          snowflake_warehouse)
 
 
 @when(parsers.re('a temporary table called "(?P<table_name>.+)" has\s+(?P<table>[\s\S]+)'))
-def temp_table_create_fixture(snowflake_sqlalchemy_conn, table_name, table):
+def temp_table_create_fixture(snowflake_sqlalchemy_conn, table_name, table, snowflake_object_registry):
     create_table_with_data(snowflake_sqlalchemy_conn, table,
-                           table_name, temporary=True)
+                           table_name, temporary=True, registry=snowflake_object_registry)
 
 
 @when(parsers.re('a table called "(?P<table_name>.+)" has\s+(?P<table>[\s\S]+)'))
-def table_create_fixture(snowflake_sqlalchemy_conn, table_name, table):
+def table_create_fixture(snowflake_sqlalchemy_conn, table_name, table, snowflake_object_registry):
     create_table_with_data(snowflake_sqlalchemy_conn, table,
-                           table_name, temporary=False)
+                           table_name, temporary=False, registry=snowflake_object_registry)
 
 
-def create_table_with_data(snowflake_sqlalchemy_conn, table, table_name, temporary):
+def create_table_with_data(snowflake_sqlalchemy_conn, table, table_name, temporary, registry=None):
     df, col_name_sqltype_pairs = table_to_df(table)
 
     assert len(table_name.split(".")) == 3, "Table name should be fully qualified ex: db_name.schema_name.table_name"
@@ -120,6 +186,9 @@ def create_table_with_data(snowflake_sqlalchemy_conn, table, table_name, tempora
         for col_name, col_type in col_name_sqltype_pairs
     ]
 
+    if registry is not None:
+        registry.wait_until_dropped(db_name, schema_name, tb_name)
+
     pd.read_sql(f"USE DATABASE \"{db_name}\"", snowflake_sqlalchemy_conn)
 
     metadata = MetaData(bind=snowflake_sqlalchemy_conn)
@@ -128,8 +197,11 @@ def create_table_with_data(snowflake_sqlalchemy_conn, table, table_name, tempora
                        *cols,
                        schema=schema_name,
                        prefixes=['TEMPORARY'] if temporary else None,
+                       comment=None if temporary else OBJECT_COMMENT,
                        )
     temp_table.create(bind=snowflake_sqlalchemy_conn)
+    if registry is not None:
+        registry.register_table(db_name, schema_name, tb_name, temporary)
 
     df.to_sql(con=snowflake_sqlalchemy_conn,
               schema=schema_name,
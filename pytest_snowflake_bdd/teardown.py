@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Tracks the objects created by the step definitions and drops them once a scenario is done."""
+
+import queue
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+
+OBJECT_COMMENT = "created by pytest-snowflake-bdd"
+
+
+class ObjectRegistry:
+    """Every object created by the plugin during a single scenario."""
+
+    def __init__(self, snowflake_teardown=None):
+        self.tables = []
+        self.snowflake_teardown = snowflake_teardown
+
+    def wait_until_dropped(self, db_name, schema_name, tb_name):
+        if self.snowflake_teardown is not None:
+            self.snowflake_teardown.wait_until_dropped(db_name, schema_name, tb_name)
+
+    def register_table(self, db_name, schema_name, tb_name, temporary):
+        self.tables.append((db_name, schema_name, tb_name, temporary))
+
+    def permanent_tables(self):
+        # Temporary tables go away with the snowflake session that created them. Dropping one by name from
+        # another session would drop the permanent table it shadows instead, so they are never torn down here.
+        return [(db_name, schema_name, tb_name) for db_name, schema_name, tb_name, temporary in self.tables
+                if not temporary]
+
+
+def drop_table_statements(engine, tables):
+    preparer = engine.dialect.identifier_preparer
+    # Databases are always quoted by the create step (USE DATABASE "db"), schemas and tables follow
+    # the same quoting rules sqlalchemy applied when creating them.
+    return [
+        f"DROP TABLE IF EXISTS {preparer.quote_identifier(db_name)}.{preparer.quote(schema_name)}."
+        f"{preparer.quote(tb_name)}"
+        for db_name, schema_name, tb_name in tables
+    ]
+
+
+def execute_batch(engine, statements):
+    """Sends all statements to snowflake in a single multi-statement request."""
+    raw_connection = engine.raw_connection()
+    try:
+        cursor = raw_connection.cursor()
+        cursor.execute(";\n".join(statements), num_statements=len(statements))
+        cursor.close()
+    finally:
+        raw_connection.close()
+
+
+class SnowflakeTeardown:
+    """Drops the permanent tables of each scenario and sweeps the ones left behind by crashed workers."""
+
+    def __init__(self, asynchronous=False, sweep_minutes=60):
+        self.asynchronous = asynchronous
+        self.sweep_minutes = sweep_minutes
+        self.schemas = set()
+        self.dropped = 0
+        self.swept = 0
+        self.teardown_seconds = 0.0
+        self.sweep_seconds = 0.0
+        self.errors = []
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        # Tables queued for the background worker and not dropped yet, guarded by _lock.
+        self._pending = set()
+        self._pending_dropped = threading.Condition(self._lock)
+
+    def teardown(self, engine, registry):
+        tables = registry.permanent_tables()
+        if not tables:
+            return
+
+        with self._lock:
+            self.schemas.update((db_name, schema_name) for db_name, schema_name, _ in tables)
+
+        if self.asynchronous:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._drop_in_background, name="snowflake-teardown",
+                                                daemon=True)
+                self._worker.start()
+            with self._lock:
+                self._pending.update(tables)
+            # The engine belongs to the scenario's fixture, the worker only borrows its url.
+            self._queue.put((engine.url, tables))
+        else:
+            self._drop(engine, tables)
+
+    def wait_until_dropped(self, db_name, schema_name, tb_name):
+        """Blocks while a previous scenario's drop of the same table is still queued."""
+        with self._pending_dropped:
+            self._pending_dropped.wait_for(lambda: (db_name, schema_name, tb_name) not in self._pending)
+
+    def _drop(self, engine, tables):
+        # Failed drops never fail the scenario, the tables are left for the session end sweep.
+        start = time.perf_counter()
+        try:
+            execute_batch(engine, drop_table_statements(engine, tables))
+            with self._lock:
+                self.dropped += len(tables)
+        except Exception as e:
+            self._drop_failed(tables, e)
+        finally:
+            with self._lock:
+                self.teardown_seconds += time.perf_counter() - start
+            self._release(tables)
+
+    def _drop_failed(self, tables, error):
+        with self._lock:
+            self.errors.append(f"dropping {', '.join('.'.join(table) for table in tables)} failed: {error}")
+
+    def _release(self, tables):
+        with self._pending_dropped:
+            self._pending.difference_update(tables)
+            self._pending_dropped.notify_all()
+
+    def _drop_in_background(self):
+        engines = {}
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                url, tables = item
+                try:
+                    key = url.render_as_string(hide_password=False)
+                    if key not in engines:
+                        engines[key] = create_engine(url)
+                except Exception as e:
+                    self._drop_failed(tables, e)
+                    self._release(tables)
+                    continue
+                self._drop(engines[key], tables)
+        finally:
+            for engine in engines.values():
+                engine.dispose()
+
+    def wait(self):
+        if self._worker is None:
+            return
+        self._queue.put(None)
+        self._worker.join()
+        self._worker = None
+
+    def sweep(self, engine):
+        """Drops tables tagged by the plugin that outlived ``sweep_minutes`` in the schemas this run used."""
+        if not self.sweep_minutes or not self.schemas:
+            return
+
+        start = time.perf_counter()
+        try:
+            tables = []
+            for db_name, schema_name in sorted(self.schemas):
+                tables.extend(self._orphaned_tables(engine, db_name, schema_name))
+            if tables:
+                execute_batch(engine, drop_table_statements(engine, tables))
+            self.swept += len(tables)
+        except Exception as e:
+            self.errors.append(f"sweeping orphaned tables failed: {e}")
+        finally:
+            self.sweep_seconds += time.perf_counter() - start
+
+    def _orphaned_tables(self, engine, db_name, schema_name):
+        preparer = engine.dialect.identifier_preparer
+        query = text(
+            f"SELECT table_name FROM {preparer.quote_identifier(db_name)}.information_schema.tables "
+            "WHERE table_schema = :schema_name AND table_type = 'BASE TABLE' AND comment = :comment "
+            "AND created < DATEADD(minute, -:sweep_minutes, CURRENT_TIMESTAMP())"
+        )
+        rows = engine.execute(query, schema_name=engine.dialect.denormalize_name(schema_name),
+                              comment=OBJECT_COMMENT, sweep_minutes=self.sweep_minutes)
+        return [(db_name, schema_name, engine.dialect.normalize_name(row[0])) for row in rows]
+
+    def summary(self):
+        mode = "in background" if self.asynchronous else "blocking"
+        lines = [f"dropped {self.dropped} table(s) in {self.teardown_seconds:.2f}s ({mode})"]
+        if self.sweep_minutes:
+            lines.append(f"swept {self.swept} orphaned table(s) in {self.sweep_seconds:.2f}s")
+        lines.extend(self.errors)
+        return lines
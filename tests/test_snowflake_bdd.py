@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import datetime
 import re
+import time
 from unittest import mock
 from unittest.mock import Mock, ANY
 
@@ -142,7 +143,7 @@ def test_create_table_with_data():
 
                 read_sql_df.assert_called_with("USE DATABASE \"my_db\"", ANY)
                 sqlalchemy_table.assert_called_with('my_table', ANY, ANY, ANY, ANY, schema='my_schema',
-                                                    prefixes=['TEMPORARY'])
+                                                    prefixes=['TEMPORARY'], comment=None)
                 assert sqlalchemy_table.call_args[0][2].name == "id"
                 assert sqlalchemy_table.call_args[0][2].type.__visit_name__ == "INTEGER"
                 assert sqlalchemy_table.call_args[0][3].name == "name"
@@ -156,6 +157,7 @@ def test_create_table_with_data():
 
 def test_temp_table_create_fixture():
     from pytest_snowflake_bdd.plugin import temp_table_create_fixture
+    from pytest_snowflake_bdd.teardown import ObjectRegistry
     with mock.patch('pytest_snowflake_bdd.plugin.pd.read_sql', return_value=[]) as read_sql_df:
         with mock.patch('pytest_snowflake_bdd.plugin.pd.DataFrame.to_sql',
                         return_value=mock.MagicMock()) as pandas_to_sql:
@@ -169,11 +171,12 @@ def test_temp_table_create_fixture():
                                | 3           | ""             | {null}           |
                     """
 
-                temp_table_create_fixture(snowflake_sqlalchemy_conn, "my_db.my_schema.my_table", table)
+                registry = ObjectRegistry()
+                temp_table_create_fixture(snowflake_sqlalchemy_conn, "my_db.my_schema.my_table", table, registry)
 
                 read_sql_df.assert_called_with("USE DATABASE \"my_db\"", ANY)
                 sqlalchemy_table.assert_called_with('my_table', ANY, ANY, ANY, ANY, schema='my_schema',
-                                                    prefixes=['TEMPORARY'])
+                                                    prefixes=['TEMPORARY'], comment=None)
                 assert sqlalchemy_table.call_args[0][2].name == "id"
                 assert sqlalchemy_table.call_args[0][2].type.__visit_name__ == "INTEGER"
                 assert sqlalchemy_table.call_args[0][3].name == "name"
@@ -183,10 +186,13 @@ def test_temp_table_create_fixture():
                 pandas_to_sql.assert_called_with(con=ANY, schema='my_schema', name='my_table', if_exists='append',
                                                  method='multi',
                                                  index=False)
+                assert registry.tables == [('my_db', 'my_schema', 'my_table', True)]
+                assert registry.permanent_tables() == []
 
 
 def test_table_create_fixture():
     from pytest_snowflake_bdd.plugin import table_create_fixture
+    from pytest_snowflake_bdd.teardown import ObjectRegistry
     with mock.patch('pytest_snowflake_bdd.plugin.pd.read_sql', return_value=[]) as read_sql_df:
         with mock.patch('pytest_snowflake_bdd.plugin.pd.DataFrame.to_sql',
                         return_value=mock.MagicMock()) as pandas_to_sql:
@@ -199,10 +205,12 @@ def test_table_create_fixture():
                                | 2           | "t"            | {null}           |
                                | 3           | ""             | {null}           |
                     """
-                table_create_fixture(snowflake_sqlalchemy_conn, "my_db.my_schema.my_table", table)
+                registry = ObjectRegistry()
+                table_create_fixture(snowflake_sqlalchemy_conn, "my_db.my_schema.my_table", table, registry)
 
                 read_sql_df.assert_called_with("USE DATABASE \"my_db\"", ANY)
-                sqlalchemy_table.assert_called_with('my_table', ANY, ANY, ANY, ANY, schema='my_schema', prefixes=None)
+                sqlalchemy_table.assert_called_with('my_table', ANY, ANY, ANY, ANY, schema='my_schema', prefixes=None,
+                                                    comment='created by pytest-snowflake-bdd')
                 assert sqlalchemy_table.call_args[0][2].name == "id"
                 assert sqlalchemy_table.call_args[0][2].type.__visit_name__ == "INTEGER"
                 assert sqlalchemy_table.call_args[0][3].name == "name"
@@ -212,6 +220,7 @@ def test_table_create_fixture():
                 pandas_to_sql.assert_called_with(con=ANY, schema='my_schema', name='my_table', if_exists='append',
                                                  method='multi',
                                                  index=False)
+                assert registry.permanent_tables() == [('my_db', 'my_schema', 'my_table')]
 
 
 def test_assert_table_contains(tmpdir):
@@ -349,3 +358,259 @@ def test_table_to_df_datetime_types():
 
     assert str(col_name_sqltype_pairs) == expected_col_name_to_sqltype_pairs
 
+
+def _mock_engine():
+    from snowflake.sqlalchemy.snowdialect import SnowflakeDialect
+    engine = mock.MagicMock()
+    engine.dialect = SnowflakeDialect()
+    return engine
+
+
+def test_drop_table_statements():
+    from pytest_snowflake_bdd.teardown import drop_table_statements
+    statements = drop_table_statements(_mock_engine(), [("my_db", "my_schema", "my_table"),
+                                                        ("my_db", "PUBLIC", "MyTable")])
+
+    assert statements == [
+        'DROP TABLE IF EXISTS "my_db".my_schema.my_table',
+        'DROP TABLE IF EXISTS "my_db"."PUBLIC"."MyTable"',
+    ]
+
+
+def test_snowflake_teardown_batches_drops():
+    from pytest_snowflake_bdd.teardown import ObjectRegistry, SnowflakeTeardown
+    engine = _mock_engine()
+    cursor = engine.raw_connection.return_value.cursor.return_value
+    registry = ObjectRegistry()
+    registry.register_table("my_db", "my_schema", "a", temporary=False)
+    registry.register_table("my_db", "my_schema", "b", temporary=True)
+    registry.register_table("my_db", "my_schema", "c", temporary=False)
+
+    snowflake_teardown = SnowflakeTeardown()
+    snowflake_teardown.teardown(engine, registry)
+
+    cursor.execute.assert_called_once_with('DROP TABLE IF EXISTS "my_db".my_schema.a;\n'
+                                           'DROP TABLE IF EXISTS "my_db".my_schema.c', num_statements=2)
+    engine.raw_connection.return_value.close.assert_called_once()
+    assert snowflake_teardown.dropped == 2
+    assert snowflake_teardown.schemas == {("my_db", "my_schema")}
+
+
+def test_snowflake_teardown_skips_temporary_tables():
+    from pytest_snowflake_bdd.teardown import ObjectRegistry, SnowflakeTeardown
+    engine = _mock_engine()
+    registry = ObjectRegistry()
+    registry.register_table("my_db", "my_schema", "a", temporary=True)
+
+    snowflake_teardown = SnowflakeTeardown()
+    snowflake_teardown.teardown(engine, registry)
+
+    engine.raw_connection.assert_not_called()
+    assert snowflake_teardown.schemas == set()
+
+
+def test_snowflake_teardown_async():
+    from pytest_snowflake_bdd.teardown import ObjectRegistry, SnowflakeTeardown
+    engine = _mock_engine()
+    worker_engine = _mock_engine()
+    cursor = worker_engine.raw_connection.return_value.cursor.return_value
+    cursor.execute.side_effect = [None, Exception("boom")]
+    snowflake_teardown = SnowflakeTeardown(asynchronous=True)
+
+    with mock.patch('pytest_snowflake_bdd.teardown.create_engine', return_value=worker_engine) as create_engine_mock:
+        for tb_name in ("a", "b"):
+            registry = ObjectRegistry()
+            registry.register_table("my_db", "my_schema", tb_name, temporary=False)
+            snowflake_teardown.teardown(engine, registry)
+        snowflake_teardown.wait()
+
+    create_engine_mock.assert_called_once_with(engine.url)
+    engine.raw_connection.assert_not_called()
+    engine.dispose.assert_not_called()
+    worker_engine.dispose.assert_called_once()
+    assert cursor.execute.call_count == 2
+    assert snowflake_teardown.dropped == 1
+    assert len(snowflake_teardown.errors) == 1
+    assert "boom" in snowflake_teardown.errors[0]
+    assert "dropped 1 table(s)" in snowflake_teardown.summary()[0]
+
+
+def test_snowflake_teardown_drop_error():
+    from pytest_snowflake_bdd.teardown import ObjectRegistry, SnowflakeTeardown
+    engine = _mock_engine()
+    engine.raw_connection.return_value.cursor.return_value.execute.side_effect = Exception("boom")
+    registry = ObjectRegistry()
+    registry.register_table("my_db", "my_schema", "a", temporary=False)
+
+    snowflake_teardown = SnowflakeTeardown()
+    snowflake_teardown.teardown(engine, registry)
+
+    assert snowflake_teardown.dropped == 0
+    assert snowflake_teardown.teardown_seconds > 0
+    assert snowflake_teardown.errors == ["dropping my_db.my_schema.a failed: boom"]
+
+
+def test_snowflake_teardown_sweep():
+    from pytest_snowflake_bdd.teardown import SnowflakeTeardown
+    engine = _mock_engine()
+    engine.execute.return_value = [("LEFTOVER",)]
+    cursor = engine.raw_connection.return_value.cursor.return_value
+    snowflake_teardown = SnowflakeTeardown(sweep_minutes=30)
+    snowflake_teardown.schemas.add(("my_db", "public"))
+
+    snowflake_teardown.sweep(engine)
+
+    assert '"my_db".information_schema.tables' in str(engine.execute.call_args[0][0])
+    assert engine.execute.call_args[1] == {"schema_name": "PUBLIC", "comment": "created by pytest-snowflake-bdd",
+                                           "sweep_minutes": 30}
+    cursor.execute.assert_called_once_with('DROP TABLE IF EXISTS "my_db".public.leftover', num_statements=1)
+    assert snowflake_teardown.swept == 1
+
+
+def test_snowflake_teardown_sweep_disabled():
+    from pytest_snowflake_bdd.teardown import SnowflakeTeardown
+    engine = _mock_engine()
+    snowflake_teardown = SnowflakeTeardown(sweep_minutes=0)
+    snowflake_teardown.schemas.add(("my_db", "public"))
+
+    snowflake_teardown.sweep(engine)
+
+    engine.execute.assert_not_called()
+
+
+def test_snowflake_teardown_sweep_error():
+    from pytest_snowflake_bdd.teardown import SnowflakeTeardown
+    engine = _mock_engine()
+    engine.execute.side_effect = Exception("insufficient privileges")
+    snowflake_teardown = SnowflakeTeardown()
+    snowflake_teardown.schemas.add(("my_db", "public"))
+
+    snowflake_teardown.sweep(engine)
+
+    engine.raw_connection.assert_not_called()
+    assert snowflake_teardown.swept == 0
+    assert snowflake_teardown.sweep_seconds > 0
+    assert snowflake_teardown.errors == ["sweeping orphaned tables failed: insufficient privileges"]
+
+
+def test_snowflake_object_registry_teardown(testdir):
+    testdir.makepyfile("""
+        def test_sth(snowflake_object_registry):
+            snowflake_object_registry.register_table("my_db", "my_schema", "my_table", temporary=False)
+            snowflake_object_registry.register_table("my_db", "my_schema", "my_temp_table", temporary=True)
+    """)
+
+    with mock.patch('pytest_snowflake_bdd.plugin.create_engine', return_value=_mock_engine()) as create_engine_mock:
+        with mock.patch('pytest_snowflake_bdd.teardown.execute_batch') as execute_batch:
+            result = testdir.runpytest(
+                '--snowflake-user=user',
+                '--snowflake-password=password',
+                '--snowflake-account=account',
+            )
+
+    engine = create_engine_mock.return_value
+    execute_batch.assert_called_once_with(engine, ['DROP TABLE IF EXISTS "my_db".my_schema.my_table'])
+    # one engine for the scenario and one for the session end sweep, both closed
+    assert create_engine_mock.call_count == 2
+    assert engine.connect.return_value.close.call_count == 2
+    assert engine.dispose.call_count == 2
+
+    result.stdout.fnmatch_lines([
+        '*snowflake teardown*',
+        'dropped 1 table(s) in *s (blocking)',
+        'swept 0 orphaned table(s) in *s',
+        '*1 passed*',
+    ])
+    assert result.ret == 0
+
+
+def test_snowflake_object_registry_async_teardown(testdir):
+    testdir.makepyfile("""
+        def test_sth(snowflake_object_registry):
+            snowflake_object_registry.register_table("my_db", "my_schema", "my_table", temporary=False)
+    """)
+
+    worker_engine = _mock_engine()
+    with mock.patch('pytest_snowflake_bdd.plugin.create_engine', return_value=_mock_engine()):
+        with mock.patch('pytest_snowflake_bdd.teardown.create_engine', return_value=worker_engine):
+            with mock.patch('pytest_snowflake_bdd.teardown.execute_batch') as execute_batch:
+                result = testdir.runpytest(
+                    '--snowflake-user=user',
+                    '--snowflake-password=password',
+                    '--snowflake-account=account',
+                    '--snowflake-async-teardown',
+                    '--snowflake-sweep-minutes=0',
+                )
+
+    execute_batch.assert_called_once_with(worker_engine, ['DROP TABLE IF EXISTS "my_db".my_schema.my_table'])
+    worker_engine.dispose.assert_called_once()
+
+    result.stdout.fnmatch_lines([
+        '*snowflake teardown*',
+        'dropped 1 table(s) in *s (in background)',
+        '*1 passed*',
+    ])
+    result.stdout.no_fnmatch_line('swept *')
+    assert result.ret == 0
+
+
+def test_snowflake_sweep_minutes_negative(testdir):
+    testdir.makepyfile("""
+        def test_sth():
+            pass
+    """)
+
+    result = testdir.runpytest(
+        '--snowflake-user=user',
+        '--snowflake-password=password',
+        '--snowflake-account=account',
+        '--snowflake-sweep-minutes=-1',
+    )
+
+    result.stderr.fnmatch_lines([
+        '*argument --snowflake-sweep-minutes: must be 0 or more, got -1*',
+    ])
+    assert result.ret != 0
+
+
+def test_snowflake_async_teardown_same_table(testdir):
+    testdir.makepyfile("""
+        import pytest
+        from pytest_snowflake_bdd.plugin import table_create_fixture
+
+        @pytest.mark.parametrize("example", [1, 2])
+        def test_sth(snowflake_sqlalchemy_conn, snowflake_object_registry, example):
+            table_create_fixture(snowflake_sqlalchemy_conn, "my_db.my_schema.my_table",
+                                 \"\"\"| id: INTEGER |
+                                    | 1           |
+                                 \"\"\", snowflake_object_registry)
+    """)
+
+    events = Mock()
+
+    def slow_drop(engine, statements):
+        time.sleep(0.2)
+        events.drop(statements)
+
+    with mock.patch('pytest_snowflake_bdd.plugin.create_engine', return_value=_mock_engine()):
+        with mock.patch('pytest_snowflake_bdd.teardown.create_engine', return_value=_mock_engine()):
+            with mock.patch('pytest_snowflake_bdd.teardown.execute_batch', side_effect=slow_drop):
+                with mock.patch('pytest_snowflake_bdd.plugin.pd.read_sql', return_value=[]):
+                    with mock.patch('pytest_snowflake_bdd.plugin.pd.DataFrame.to_sql'):
+                        with mock.patch('pytest_snowflake_bdd.plugin.Table') as sqlalchemy_table:
+                            sqlalchemy_table.return_value.create.side_effect = lambda **kwargs: events.create()
+                            result = testdir.runpytest(
+                                '--snowflake-user=user',
+                                '--snowflake-password=password',
+                                '--snowflake-account=account',
+                                '--snowflake-async-teardown',
+                                '--snowflake-sweep-minutes=0',
+                            )
+
+    # the second example waits for the queued drop of the first one before creating the table again
+    assert [name for name, _, _ in events.mock_calls] == ["create", "drop", "create", "drop"]
+    result.stdout.fnmatch_lines([
+        'dropped 2 table(s) in *s (in background)',
+        '*2 passed*',
+    ])
+    assert result.ret == 0